@@ -4,12 +4,11 @@ import logging
 import sys
 import cv2
 
-from motion import detect_motion
-from face import train_model, load_model, recognize_faces
-from recorder import Recorder
+from face import train_model
+from engine import Engine
 
 
-def parse_args():
+def parse_args(argv=None):
     parser = argparse.ArgumentParser(
         description="Security Cam with Multi-Face Recognition"
     )
@@ -25,6 +24,15 @@ def parse_args():
                         help="Minimum contour area for motion detection")
     parser.add_argument('--face-interval', type=int, default=10,
                         help="Run face recognition every N frames")
+    parser.add_argument('--face-size', type=float, default=0.15,
+                        help="Smallest expected face height as a fraction of frame height")
+    parser.add_argument('--face-latency', type=float, default=50,
+                        help="Target face detection time per frame in ms (0 = no limit); "
+                             "a tight target lowers the detection scale and may "
+                             "miss faces smaller than --face-size (a warning is logged)")
+    parser.add_argument('--face-roi', action='store_true',
+                        help="Search for faces only in the region covering all motion, "
+                             "zoomed in; frames without motion get a full-frame pass")
     parser.add_argument('--duration', type=int, default=20,
                         help="Max recording duration (seconds)")
     parser.add_argument('--snapshot', action='store_true',
@@ -47,7 +55,7 @@ def parse_args():
                         help="Confidence threshold for unknown faces (0–1)")
     parser.add_argument('--verbose', action='store_true',
                         help="Enable debug logging")
-    return parser.parse_args()
+    return parser.parse_args(argv)
 
 
 def main():
@@ -65,119 +73,15 @@ def main():
         train_model(data_dir=args.data, model_path=args.model)
         return
 
-    # Load or train face model
+    engine = Engine(args)
     try:
-        clf, le = load_model(args.model)
-    except FileNotFoundError:
-        logging.info("Model not found; training now.")
-        train_model(data_dir=args.data, model_path=args.model)
-        clf, le = load_model(args.model)
-    trusted_set = set(le.classes_)
-
-    # Haar Cascade
-    cascade = cv2.CascadeClassifier(
-        cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
-    )
-    if cascade.empty():
-        logging.error("Failed to load Haar cascade")
+        engine.open()
+    except RuntimeError as e:
+        logging.error(e)
         sys.exit(1)
 
-    # Initialize cameras based on --cam-num
-    cameras = []
-    for cam_id in range(args.cam_num):
-        cap = cv2.VideoCapture(cam_id)
-        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
-        if args.resolution:
-            w, h = map(int, args.resolution.split('x'))
-            cap.set(cv2.CAP_PROP_FRAME_WIDTH, w)
-            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, h)
-        if not cap.isOpened():
-            logging.warning(f"Camera {cam_id} could not be opened.")
-            cameras.append(None)
-        else:
-            recorder = Recorder(
-                output_dir=f'recordings/cam{cam_id}',
-                fps=args.fps,
-                duration=args.duration,
-                snapshot=args.snapshot,
-                snapshot_interval=args.snapshot_interval,
-                no_record=args.no_record
-            )
-            cameras.append({
-                'id': cam_id,
-                'cap': cap,
-                'avg': None,
-                'recorder': recorder,
-                'frame_no': 0,
-                'last_ann': [],
-                'motion': False,
-                'roi': None,
-                'trusted_present': False
-            })
-
     while True:
-        frames = []
-        any_motion = False
-        trusted_found = False
-
-        # Process each camera
-        for cam in cameras:
-            if not cam:
-                frames.append(None)
-                continue
-
-            ret, frame = cam['cap'].read()
-            if not ret:
-                frames.append(None)
-                continue
-
-            cam['frame_no'] += 1
-            cam['avg'], cam['motion'], cam['roi'] = detect_motion(frame, cam['avg'], args.min_area)
-
-            # Face recognition at intervals
-            if cam['frame_no'] % args.face_interval == 0:
-                cam['last_ann'] = recognize_faces(
-                    frame, clf, le, trusted_set, threshold=args.threshold
-                )
-
-            # Check for trusted faces
-            cam['trusted_present'] = any(
-                name in trusted_set for (_, _, _, _, name, _) in cam['last_ann']
-            )
-
-            if cam['motion']:
-                any_motion = True
-            if cam['trusted_present']:
-                trusted_found = True
-
-            frames.append(frame)
-
-        # Decide recording per camera
-        for cam, frame in zip(cameras, frames):
-            if not cam or frame is None:
-                continue
-
-            record = False
-            # No trusted face & any motion -> record
-            if not cam['trusted_present'] and any_motion:
-                record = True
-            # No trusted anywhere & any motion -> record all
-            elif any_motion and not trusted_found:
-                record = True
-
-            if record and cam['recorder'].writer is None and not args.no_record:
-                cam['recorder'].start(frame)
-            if cam['recorder'].writer:
-                cam['recorder'].update(frame)
-
-            # Visualization
-            if cam['roi']:
-                x, y, w, h = cam['roi']
-                cv2.rectangle(frame, (x, y), (x + w, y + h), (255, 0, 0), 2)
-            for (x1, y1, x2, y2, name, color) in cam['last_ann']:
-                cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
-                cv2.putText(frame, name, (x1, y1 - 10),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
+        frames = engine.step()
 
         # Display combined
         if not args.no_display:
@@ -192,13 +96,8 @@ def main():
                 break
 
     # Cleanup
-    for cam in cameras:
-        if cam:
-            cam['cap'].release()
-            if cam['recorder'].writer:
-                cam['recorder'].stop()
+    engine.close()
     cv2.destroyAllWindows()
 
-
 if __name__ == "__main__":
     main()
@@ -0,0 +1,308 @@
+#engine.py
+import time
+import queue
+import logging
+import threading
+
+import cv2
+
+from motion import detect_motion
+from face import train_model, load_model, recognize_faces, FaceScaler
+from recorder import Recorder
+
+# settings that can be changed while the engine is running
+LIVE_SETTINGS = (
+    'min_area', 'face_interval', 'threshold', 'face_size', 'face_latency',
+    'face_roi', 'duration', 'snapshot', 'snapshot_interval'
+)
+# seconds to wait before retrying when no camera delivered a frame
+IDLE_WAIT = 0.1
+
+
+class Engine:
+    def __init__(self, args, publish=False, queue_size=2):
+        """
+        Runs motion detection, face recognition and recording for all cameras.
+
+        Args:
+            args (Namespace): options as returned by cli.parse_args()
+            publish (bool): push annotated frames to per-camera queues
+                for a viewer (see latest_frame)
+            queue_size (int): frames kept per camera before the oldest
+                is dropped
+        """
+        self.args = args
+        self.publish = publish
+        self.queue_size = queue_size
+
+        self.cameras = []
+        self.clf = None
+        self.le = None
+        self.trusted_set = set()
+
+        self.pending = queue.Queue()
+        self.stopped = threading.Event()
+
+    def open(self):
+        """
+        Load the face model (training it if missing) and open the cameras.
+        Raises RuntimeError if the Haar cascade cannot be loaded or no
+        camera could be opened.
+        """
+        args = self.args
+        try:
+            self.clf, self.le = load_model(args.model)
+        except FileNotFoundError:
+            logging.info("Model not found; training now.")
+            train_model(data_dir=args.data, model_path=args.model)
+            self.clf, self.le = load_model(args.model)
+        self.trusted_set = set(self.le.classes_)
+
+        cascade = cv2.CascadeClassifier(
+            cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
+        )
+        if cascade.empty():
+            raise RuntimeError("Failed to load Haar cascade")
+
+        cameras = []
+        for cam_id in range(args.cam_num):
+            cap = cv2.VideoCapture(cam_id)
+            cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+            if args.resolution:
+                w, h = map(int, args.resolution.split('x'))
+                cap.set(cv2.CAP_PROP_FRAME_WIDTH, w)
+                cap.set(cv2.CAP_PROP_FRAME_HEIGHT, h)
+            if not cap.isOpened():
+                logging.warning(f"Camera {cam_id} could not be opened.")
+                cameras.append(None)
+                continue
+
+            recorder = Recorder(
+                output_dir=f'recordings/cam{cam_id}',
+                fps=args.fps,
+                duration=args.duration,
+                snapshot=args.snapshot,
+                snapshot_interval=args.snapshot_interval,
+                no_record=args.no_record
+            )
+            cameras.append({
+                'id': cam_id,
+                'cap': cap,
+                'avg': None,
+                'recorder': recorder,
+                'scaler': FaceScaler(
+                    face_size=args.face_size,
+                    target_latency=args.face_latency / 1000.0,
+                    name=f"cam{cam_id}"
+                ),
+                'frames': queue.Queue(maxsize=self.queue_size),
+                'frame_no': 0,
+                'last_ann': [],
+                'motion': False,
+                'roi': None,
+                'trusted_present': False,
+                'last_time': None,
+                'stats': {
+                    'fps': 0.0,
+                    'read_ms': 0.0,
+                    'motion_ms': 0.0,
+                    'face_ms': 0.0,
+                    'record_ms': 0.0,
+                    'motion': False,
+                    'trusted': False,
+                    'recording': False,
+                    'dropped': 0
+                }
+            })
+
+        if not any(cameras):
+            raise RuntimeError("No camera could be opened")
+
+        # publish the list only once it is complete; viewers poll it
+        self.cameras = cameras
+
+    def update(self, **settings):
+        """
+        Queue new values for LIVE_SETTINGS; they apply from the next frame.
+        Safe to call from another thread.
+        """
+        for key in settings:
+            if key not in LIVE_SETTINGS:
+                raise ValueError(f"Setting cannot be changed live: {key}")
+        self.pending.put(settings)
+
+    def _apply_settings(self):
+        while True:
+            try:
+                settings = self.pending.get_nowait()
+            except queue.Empty:
+                return
+            for key, value in settings.items():
+                setattr(self.args, key, value)
+                logging.debug(f"Live setting {key} = {value}")
+
+            for cam in self.cameras:
+                if not cam:
+                    continue
+                cam['scaler'].face_size = self.args.face_size
+                cam['scaler'].target_latency = self.args.face_latency / 1000.0
+                cam['recorder'].duration = self.args.duration
+                cam['recorder'].snapshot = self.args.snapshot
+                cam['recorder'].snapshot_interval = self.args.snapshot_interval
+
+    def step(self):
+        """
+        Read and process one frame from every camera.
+        Returns the annotated frames (None where a camera gave no frame).
+        """
+        self._apply_settings()
+        args = self.args
+        frames = []
+        any_motion = False
+        trusted_found = False
+
+        # Process each camera
+        for cam in self.cameras:
+            if not cam:
+                frames.append(None)
+                continue
+
+            stats = cam['stats']
+            start = time.perf_counter()
+            ret, frame = cam['cap'].read()
+            now = time.perf_counter()
+            stats['read_ms'] = (now - start) * 1000
+            if not ret:
+                frames.append(None)
+                continue
+
+            if cam['last_time'] is not None and now > cam['last_time']:
+                fps = 1.0 / (now - cam['last_time'])
+                stats['fps'] = 0.9 * stats['fps'] + 0.1 * fps if stats['fps'] else fps
+            cam['last_time'] = now
+
+            cam['frame_no'] += 1
+            start = time.perf_counter()
+            cam['avg'], cam['motion'], cam['roi'] = detect_motion(frame, cam['avg'], args.min_area)
+            stats['motion_ms'] = (time.perf_counter() - start) * 1000
+
+            # Face recognition at intervals
+            if cam['frame_no'] % args.face_interval == 0:
+                start = time.perf_counter()
+                cam['last_ann'] = recognize_faces(
+                    frame, self.clf, self.le, self.trusted_set,
+                    threshold=args.threshold,
+                    scaler=cam['scaler'],
+                    roi=cam['roi'] if args.face_roi else None
+                )
+                stats['face_ms'] = (time.perf_counter() - start) * 1000
+
+            # Check for trusted faces
+            cam['trusted_present'] = any(
+                name in self.trusted_set for (_, _, _, _, name, _) in cam['last_ann']
+            )
+
+            if cam['motion']:
+                any_motion = True
+            if cam['trusted_present']:
+                trusted_found = True
+
+            frames.append(frame)
+
+        # Decide recording per camera
+        for cam, frame in zip(self.cameras, frames):
+            if not cam or frame is None:
+                continue
+
+            start = time.perf_counter()
+            record = False
+            # No trusted face & any motion -> record
+            if not cam['trusted_present'] and any_motion:
+                record = True
+            # No trusted anywhere & any motion -> record all
+            elif any_motion and not trusted_found:
+                record = True
+
+            if record and cam['recorder'].writer is None and not args.no_record:
+                cam['recorder'].start(frame)
+            if cam['recorder'].writer:
+                cam['recorder'].update(frame)
+
+            stats = cam['stats']
+            stats['record_ms'] = (time.perf_counter() - start) * 1000
+            stats['motion'] = cam['motion']
+            stats['trusted'] = cam['trusted_present']
+            stats['recording'] = cam['recorder'].writer is not None
+
+            # Visualization
+            if cam['roi']:
+                x, y, w, h = cam['roi']
+                cv2.rectangle(frame, (x, y), (x + w, y + h), (255, 0, 0), 2)
+            for (x1, y1, x2, y2, name, color) in cam['last_ann']:
+                cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
+                cv2.putText(frame, name, (x1, y1 - 10),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
+
+            if self.publish:
+                self._publish(cam, frame)
+
+        return frames
+
+    def _publish(self, cam, frame):
+        # keep only the newest frames; a slow viewer must not stall capture
+        frames = cam['frames']
+        while True:
+            try:
+                frames.put_nowait(frame)
+                break
+            except queue.Full:
+                try:
+                    frames.get_nowait()
+                    cam['stats']['dropped'] += 1
+                except queue.Empty:
+                    pass
+
+    def latest_frame(self, index):
+        """
+        Return the newest published frame of camera `index`, or None.
+        """
+        cam = self.cameras[index]
+        if not cam:
+            return None
+        frame = None
+        while True:
+            try:
+                frame = cam['frames'].get_nowait()
+            except queue.Empty:
+                return frame
+
+    def stats(self):
+        """
+        Return a snapshot of per-camera stats (None for unopened cameras),
+        including how many frames wait in each viewer queue.
+        """
+        return [dict(cam['stats'], queue=cam['frames'].qsize()) if cam else None
+                for cam in self.cameras]
+
+    def run(self):
+        """
+        Process frames until stop() is called.
+        """
+        while not self.stopped.is_set():
+            frames = self.step()
+            # don't spin while every camera fails to deliver frames
+            if not any(f is not None for f in frames):
+                self.stopped.wait(IDLE_WAIT)
+
+    def stop(self):
+        self.stopped.set()
+
+    def close(self):
+        """
+        Release cameras and finish any running recordings.
+        """
+        for cam in self.cameras:
+            if cam:
+                cam['cap'].release()
+                if cam['recorder'].writer:
+                    cam['recorder'].stop()
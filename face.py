@@ -1,5 +1,6 @@
 #face.py
 import os
+import time
 import pickle
 import logging
 
@@ -8,6 +9,84 @@ import face_recognition
 from sklearn.preprocessing import LabelEncoder
 from sklearn.svm import SVC
 
+# smallest face (px) the HOG detector finds with its default single upsample
+HOG_MIN_FACE = 40
+# never shrink detection below this, however tight the latency budget
+MIN_SCALE = 0.1
+# seconds between warnings that the latency cap hides small faces
+WARN_INTERVAL = 60
+
+
+class FaceScaler:
+    def __init__(self, face_size=0.15, target_latency=0.05, max_zoom=2.0,
+                 name='camera'):
+        """
+        Picks the detection scale for one camera.
+
+        Args:
+            face_size (float): smallest expected face height, as a fraction
+                of the frame height
+            target_latency (float): detection time budget in seconds
+                (0 or less disables the latency cap)
+            max_zoom (float): largest upscale allowed on a motion ROI
+            name (str): camera name used in warnings
+        """
+        self.face_size = face_size
+        self.target_latency = target_latency
+        self.max_zoom = max_zoom
+        self.name = name
+        # ROI crops carry more fixed overhead per pixel than full frames,
+        # so each kind of pass keeps its own running average of s/pixel
+        self.sec_per_px = {'full': None, 'roi': None}
+        self.last_warning = None
+
+    def scale_for(self, width, height, frame_height, roi=False):
+        """
+        Return the scale for a width x height detection area: just enough to
+        keep the expected face above the HOG minimum, capped at 1.0 (or
+        max_zoom for a motion ROI) and by the number of pixels the latency
+        budget can afford. Warns when that budget hides expected faces.
+        """
+        face_px = max(self.face_size * frame_height, 1)
+        needed = HOG_MIN_FACE / face_px
+        uncapped = max(min(needed, self.max_zoom if roi else 1.0), MIN_SCALE)
+        scale = uncapped
+
+        rate = self.sec_per_px['roi' if roi else 'full']
+        if self.target_latency > 0 and rate:
+            budget = self.target_latency / rate
+            scale = max(min(scale, (budget / (width * height)) ** 0.5), MIN_SCALE)
+
+        if scale < uncapped:
+            self._warn_small_faces(scale, face_px)
+        return scale
+
+    def _warn_small_faces(self, scale, face_px):
+        now = time.monotonic()
+        if self.last_warning is not None and now - self.last_warning < WARN_INTERVAL:
+            return
+        self.last_warning = now
+        logging.warning(
+            f"{self.name}: latency target limits face detection to scale "
+            f"{scale:.2f}; faces smaller than {HOG_MIN_FACE / scale:.0f} px "
+            f"(expected {face_px:.0f} px) will be missed. Raise --face-latency "
+            f"or use --face-roi.")
+
+    def observe(self, pixels, seconds, roi=False):
+        """
+        Update the measured detection cost (running average of s/pixel)
+        for full-frame or ROI passes.
+        """
+        if pixels <= 0:
+            return
+        key = 'roi' if roi else 'full'
+        rate = seconds / pixels
+        if self.sec_per_px[key] is None:
+            self.sec_per_px[key] = rate
+        else:
+            self.sec_per_px[key] = 0.8 * self.sec_per_px[key] + 0.2 * rate
+
+
 def train_model(data_dir='faces', model_path='model.pkl'):
     known_encodings = []
     known_names = []
@@ -59,20 +138,52 @@ def load_model(model_path='model.pkl'):
         data = pickle.load(f)
     return data['classifier'], data['le']
 
-def recognize_faces(frame, clf, le, trusted_set, threshold=0.7):
+def _pad_roi(roi, width, height, pad=0.25):
+    # grow the motion box so faces at its edge are not cut off
+    x, y, w, h = roi
+    dx, dy = int(w * pad), int(h * pad)
+    x1, y1 = max(x - dx, 0), max(y - dy, 0)
+    x2, y2 = min(x + w + dx, width), min(y + h + dy, height)
+    return x1, y1, x2 - x1, y2 - y1
+
+def recognize_faces(frame, clf, le, trusted_set, threshold=0.7,
+                    scaler=None, roi=None):
     """
     Detect faces, compute embeddings, classify them, and choose a color.
     If max prediction probability < threshold, labels as "Unknown".
+    Detection runs at the scale chosen by `scaler`; if `roi` (x, y, w, h)
+    is given, only that region is searched and it may be zoomed in.
     Returns a list of (l, t, r, b, name, color).
     """
-    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    small = cv2.resize(rgb, (0, 0), fx=0.5, fy=0.5)
-
+    if scaler is None:
+        scaler = FaceScaler()
+
+    frame_h, frame_w = frame.shape[:2]
+    if roi:
+        x, y, w, h = _pad_roi(roi, frame_w, frame_h)
+    else:
+        x, y, w, h = 0, 0, frame_w, frame_h
+
+    rgb = cv2.cvtColor(frame[y:y + h, x:x + w], cv2.COLOR_BGR2RGB)
+    scale = scaler.scale_for(w, h, frame_h, roi=bool(roi))
+    if scale == 1.0:
+        small = rgb
+    else:
+        interp = cv2.INTER_AREA if scale < 1.0 else cv2.INTER_LINEAR
+        small = cv2.resize(rgb, (0, 0), fx=scale, fy=scale,
+                           interpolation=interp)
+    logging.debug(f"Face detection on {w}x{h} at scale {scale:.2f}")
+
+    start = time.perf_counter()
     boxes = face_recognition.face_locations(small, model='hog')
+    scaler.observe(small.shape[0] * small.shape[1],
+                   time.perf_counter() - start, roi=bool(roi))
     annotations = []
 
     for box in boxes:
-        top, right, bottom, left = [v * 2 for v in box]
+        top, right, bottom, left = [int(round(v / scale)) for v in box]
+        top, left = max(top, 0), max(left, 0)
+        bottom, right = min(bottom, h), min(right, w)
         enc = face_recognition.face_encodings(rgb, [(top, right, bottom, left)])[0]
         probs = clf.predict_proba([enc])[0]
         idx = probs.argmax()
@@ -84,6 +195,6 @@ def recognize_faces(frame, clf, le, trusted_set, threshold=0.7):
         else:
             name = le.inverse_transform([idx])[0]
             color = (0, 255, 0) if name in trusted_set else (0, 0, 255)
-        annotations.append((left, top, right, bottom, name, color))
+        annotations.append((left + x, top + y, right + x, bottom + y, name, color))
 
     return annotations
\ No newline at end of file
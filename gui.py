@@ -1,16 +1,28 @@
 #gui.py
 import sys
 import os
-import subprocess
+import logging
+import threading
 from functools import partial
 
+import cv2
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QLabel, QCheckBox,
     QSpinBox, QDoubleSpinBox, QLineEdit, QPushButton,
-    QComboBox, QFileDialog, QFormLayout, QHBoxLayout, QVBoxLayout
+    QComboBox, QFileDialog, QFormLayout, QHBoxLayout, QVBoxLayout,
+    QGridLayout
 )
-from PySide6.QtCore import Qt
-from PySide6.QtGui import QPalette, QColor
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtGui import QPalette, QColor, QImage, QPixmap
+
+from cli import parse_args
+from engine import Engine
+from face import train_model
+
+# width of a live camera tile in pixels
+TILE_WIDTH = 320
+# dashboard refresh period in ms
+REFRESH_MS = 50
 
 # Simple translations
 TRANSLATIONS = {
@@ -20,6 +32,9 @@ TRANSLATIONS = {
         'Camera Number': 'Camera Number',
         'Min Area': 'Min Area',
         'Face Interval': 'Face Interval',
+        'Face Size': 'Face Size',
+        'Face Latency (ms)': 'Face Latency (ms)',
+        'Face ROI': 'Face ROI',
         'Duration (s)': 'Duration (s)',
         'Snapshots': 'Snapshots',
         'Snapshot Interval': 'Snapshot Interval',
@@ -34,6 +49,11 @@ TRANSLATIONS = {
         'Theme': 'Theme',
         'Language': 'Language',
         'Run': 'Run',
+        'Stop': 'Stop',
+        'Recording': 'Recording',
+        'Idle': 'Idle',
+        'Unavailable': 'Unavailable',
+        'Error': 'Error',
         'Browse': 'Browse...'
     },
     'tr': {
@@ -42,6 +62,9 @@ TRANSLATIONS = {
         'Camera Number': 'Kamera Sayısı',
         'Min Area': 'Min Alan',
         'Face Interval': 'Yüz Aralığı',
+        'Face Size': 'Yüz Boyutu',
+        'Face Latency (ms)': 'Yüz Gecikmesi (ms)',
+        'Face ROI': 'Yüz ROI',
         'Duration (s)': 'Süre (s)',
         'Snapshots': 'Anlık Görüntüler',
         'Snapshot Interval': 'Anlık Gör. Aralığı',
@@ -56,6 +79,11 @@ TRANSLATIONS = {
         'Theme': 'Tema',
         'Language': 'Dil',
         'Run': 'Çalıştır',
+        'Stop': 'Durdur',
+        'Recording': 'Kaydediliyor',
+        'Idle': 'Beklemede',
+        'Unavailable': 'Kullanılamıyor',
+        'Error': 'Hata',
         'Browse': 'Gözat...'
     }
 }
@@ -64,13 +92,21 @@ class ConfigWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Security Cam Configuration")
+        self.engine = None
+        self.engine_error = None
+        self.worker = None
+        self.tiles = []
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh_dashboard)
         self.init_ui()
 
     def init_ui(self):
         # Central widget and layout
         self.central = QWidget()
         self.setCentralWidget(self.central)
-        main_layout = QVBoxLayout(self.central)
+        root_layout = QHBoxLayout(self.central)
+        main_layout = QVBoxLayout()
+        root_layout.addLayout(main_layout)
         form = QFormLayout()
 
         # Language selection
@@ -115,6 +151,26 @@ class ConfigWindow(QMainWindow):
         self.spin_face_int.setRange(1, 100)
         form.addRow(faceint_label, self.spin_face_int)
 
+        # Expected face size (fraction of frame height)
+        facesize_label = QLabel(self.trans('Face Size'))
+        self.spin_face_size = QDoubleSpinBox()
+        self.spin_face_size.setRange(0.02, 1.0)
+        self.spin_face_size.setDecimals(2)
+        self.spin_face_size.setValue(0.15)
+        form.addRow(facesize_label, self.spin_face_size)
+
+        # Face detection latency target
+        facelat_label = QLabel(self.trans('Face Latency (ms)'))
+        self.spin_face_lat = QSpinBox()
+        self.spin_face_lat.setRange(0, 1000)
+        self.spin_face_lat.setValue(50)
+        form.addRow(facelat_label, self.spin_face_lat)
+
+        # Face detection on motion ROI only
+        faceroi_label = QLabel(self.trans('Face ROI'))
+        self.chk_face_roi = QCheckBox()
+        form.addRow(faceroi_label, self.chk_face_roi)
+
         # Recording duration
         duration_label = QLabel(self.trans('Duration (s)'))
         self.spin_duration = QSpinBox()
@@ -189,6 +245,28 @@ class ConfigWindow(QMainWindow):
         self.btn_run.clicked.connect(self.run_program)
         main_layout.addWidget(self.btn_run)
 
+        # Engine errors are shown here rather than only in the log
+        self.lbl_error = QLabel()
+        self.lbl_error.setStyleSheet('color: red')
+        self.lbl_error.setWordWrap(True)
+        main_layout.addWidget(self.lbl_error)
+
+        # Live dashboard: one tile per camera, filled once the engine runs
+        self.dashboard = QGridLayout()
+        root_layout.addLayout(self.dashboard)
+
+        # Settings the running engine picks up without a restart
+        self.spin_min_area.valueChanged.connect(partial(self.apply_live, 'min_area'))
+        self.spin_face_int.valueChanged.connect(partial(self.apply_live, 'face_interval'))
+        self.spin_face_size.valueChanged.connect(partial(self.apply_live, 'face_size'))
+        self.spin_face_lat.valueChanged.connect(
+            lambda v: self.apply_live('face_latency', float(v)))
+        self.chk_face_roi.toggled.connect(partial(self.apply_live, 'face_roi'))
+        self.spin_duration.valueChanged.connect(partial(self.apply_live, 'duration'))
+        self.chk_snap.toggled.connect(partial(self.apply_live, 'snapshot'))
+        self.spin_snap_int.valueChanged.connect(partial(self.apply_live, 'snapshot_interval'))
+        self.spin_thr.valueChanged.connect(partial(self.apply_live, 'threshold'))
+
         # Initial translations and theme
         self.update_translations(self.lang_combo.currentText())
         self.apply_theme(self.theme_combo.currentText())
@@ -242,14 +320,17 @@ class ConfigWindow(QMainWindow):
         if path:
             line.setText(path)
 
-    def run_program(self):
-        # Collect arguments and launch CLI
+    def build_args(self):
+        # Collect the form into CLI-style arguments
         args = []
         if self.chk_train.isChecked(): args.append('-train')
         if self.chk_cam.isChecked(): args.append('-cam')
         args += ['--cam-num', str(self.spin_cam_num.value())]
         args += ['--min-area', str(self.spin_min_area.value())]
         args += ['--face-interval', str(self.spin_face_int.value())]
+        args += ['--face-size', str(self.spin_face_size.value())]
+        args += ['--face-latency', str(self.spin_face_lat.value())]
+        if self.chk_face_roi.isChecked(): args.append('--face-roi')
         args += ['--duration', str(self.spin_duration.value())]
         if self.chk_snap.isChecked(): args.append('--snapshot')
         args += ['--snapshot-interval', str(self.spin_snap_int.value())]
@@ -261,11 +342,119 @@ class ConfigWindow(QMainWindow):
         args += ['--data', self.line_data.text()]
         args += ['--threshold', str(self.spin_thr.value())]
         if self.chk_verbose.isChecked(): args.append('--verbose')
-        subprocess.Popen([sys.executable, os.path.abspath(sys.argv[0])] + args)
-        self.close()
+        return args
+
+    def run_program(self):
+        # Start the engine in a worker thread, or stop it if running
+        if self.worker and self.worker.is_alive():
+            self.stop_engine()
+            return
+
+        args = parse_args(self.build_args())
+        logging.getLogger().setLevel(logging.DEBUG if args.verbose else logging.INFO)
+        self.engine_error = None
+        self.lbl_error.clear()
+        self.clear_tiles()
+        # Created here so live changes made while it opens are queued, not lost
+        self.engine = None if args.train else Engine(args, publish=not args.no_display)
+        self.worker = threading.Thread(target=self.run_engine,
+                                       args=(args, self.engine), daemon=True)
+        self.worker.start()
+        if args.train:
+            # training cannot be interrupted, so don't offer a Stop
+            self.btn_run.setEnabled(False)
+        else:
+            self.btn_run.setText(self.trans('Stop'))
+        self.timer.start(REFRESH_MS)
+
+    def run_engine(self, args, engine):
+        # Worker thread: same flow as cli.main, frames go to the dashboard
+        try:
+            if args.train:
+                train_model(data_dir=args.data, model_path=args.model)
+                return
+            engine.open()
+            engine.run()
+        except Exception as e:
+            logging.exception("Engine stopped with an error")
+            self.engine_error = e
+        finally:
+            if engine:
+                engine.close()
+
+    def stop_engine(self):
+        if self.engine:
+            self.engine.stop()
+
+    def apply_live(self, key, value):
+        # Forward a changed setting to the running engine
+        if self.engine:
+            self.engine.update(**{key: value})
+
+    def clear_tiles(self):
+        for image, info in self.tiles:
+            image.deleteLater()
+            info.deleteLater()
+        self.tiles = []
+
+    def refresh_dashboard(self):
+        # Poll the engine for new frames and stats (GUI thread only)
+        if not (self.worker and self.worker.is_alive()):
+            self.timer.stop()
+            self.btn_run.setText(self.trans('Run'))
+            self.btn_run.setEnabled(True)
+            self.clear_tiles()
+            if self.engine_error:
+                self.lbl_error.setText(f"{self.trans('Error')}: "
+                                       f"{str(self.engine_error) or type(self.engine_error).__name__}")
+            return
+        if not self.engine:
+            return
+
+        stats = self.engine.stats()
+        if len(self.tiles) != len(stats):
+            self.clear_tiles()
+            for i in range(len(stats)):
+                image, info = QLabel(), QLabel()
+                image.setFixedWidth(TILE_WIDTH)
+                self.dashboard.addWidget(image, (i // 2) * 2, i % 2)
+                self.dashboard.addWidget(info, (i // 2) * 2 + 1, i % 2)
+                self.tiles.append((image, info))
+
+        for i, (s, (image, info)) in enumerate(zip(stats, self.tiles)):
+            if s is None:
+                info.setText(f"cam{i}: {self.trans('Unavailable')}")
+                continue
+
+            frame = self.engine.latest_frame(i)
+            if frame is not None:
+                rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                h, w = rgb.shape[:2]
+                img = QImage(rgb.data, w, h, 3 * w, QImage.Format_RGB888)
+                image.setPixmap(QPixmap.fromImage(img).scaledToWidth(
+                    TILE_WIDTH, Qt.SmoothTransformation))
+
+            state = self.trans('Recording') if s['recording'] else self.trans('Idle')
+            info.setText(
+                f"cam{i}: {s['fps']:.1f} FPS | {state}\n"
+                f"read {s['read_ms']:.0f} ms, motion {s['motion_ms']:.0f} ms, "
+                f"face {s['face_ms']:.0f} ms, record {s['record_ms']:.0f} ms\n"
+                f"viewer queue {s['queue']}, dropped {s['dropped']}"
+            )
+
+    def closeEvent(self, event):
+        # Stop the engine and wait, so recordings and a model being
+        # trained are written out completely before exit
+        self.stop_engine()
+        if self.worker:
+            self.worker.join()
+        super().closeEvent(event)
 
 
 def launch_gui():
+    # no-op when started through cli.py, which configures logging itself
+    logging.basicConfig(format='[%(asctime)s] %(levelname)s: %(message)s',
+                        level=logging.INFO)
     app = QApplication(sys.argv)
     win = ConfigWindow()
     win.show()
@@ -14,7 +14,8 @@ def detect_motion(frame, avg_frame, min_area=500, accum_weight=0.5):
     Returns:
         avg_frame (ndarray): updated running average
         motion (bool): True if motion detected
-        roi (tuple or None): (x, y, w, h) of motion bounding box
+        roi (tuple or None): (x, y, w, h) bounding box around all moving
+            regions larger than min_area
     """
     # convert to grayscale and blur to reduce noise
     gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
@@ -30,11 +31,14 @@ def detect_motion(frame, avg_frame, min_area=500, accum_weight=0.5):
     thresh = cv2.threshold(frame_delta, 25, 255, cv2.THRESH_BINARY)[1]
     thresh = cv2.dilate(thresh, None, iterations=2)
 
-    # find contours and see if any exceed min_area
+    # find contours and merge every one that exceeds min_area
     contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-    for c in contours:
-        if cv2.contourArea(c) > min_area:
-            x, y, w, h = cv2.boundingRect(c)
-            return avg_frame, True, (x, y, w, h)
+    boxes = [cv2.boundingRect(c) for c in contours if cv2.contourArea(c) > min_area]
+    if not boxes:
+        return avg_frame, False, None
 
-    return avg_frame, False, None
\ No newline at end of file
+    x1 = min(x for x, _, _, _ in boxes)
+    y1 = min(y for _, y, _, _ in boxes)
+    x2 = max(x + w for x, _, w, _ in boxes)
+    y2 = max(y + h for _, y, _, h in boxes)
+    return avg_frame, True, (x1, y1, x2 - x1, y2 - y1)
\ No newline at end of file